@@ -2,28 +2,86 @@
 # Licensed under the MIT license.
 
 
-from typing import Mapping, MutableMapping, Any, Optional
+from functools import lru_cache
+from typing import Mapping, MutableMapping, Any, Optional, Tuple
 
 
 _PREFIX_NODE = '_copy' # for copy node content command (must be dict)
 _PREFIX_PATH = '_copy:' # for copy node value command (must be scaler)
+_PREFIX_PATH_LEN = len(_PREFIX_PATH)
 
+# Internally paths are tuple of keys from the root, so root is () and '/a/b' is
+# ('a', 'b'). This avoids splitting and joining strings at every step of resolution.
+_Path = Tuple[Any, ...]
 
-def resolve_all(root_d:MutableMapping):
-    _resolve_all(root_d, root_d, '/', set())
-
-def _resolve_all(root_d:MutableMapping, cur:MutableMapping, cur_path:str, prev_paths:set):
-    assert is_proper_path(cur_path)
 
-    if cur_path in prev_paths:
-        return # else we get in to infinite recursion
-    prev_paths.add(cur_path)
+def resolve_all(root_d:MutableMapping):
+    _resolve_all(root_d, root_d, (), set(), set(), {})
+
+def _resolve_all(root_d:MutableMapping, cur:MutableMapping, cur_path:_Path,
+                 in_progress:set, completed:set, memo:dict):
+    if not _enter_node(root_d, cur, cur_path, in_progress, completed, memo):
+        return
+
+    # walk nested dicts depth first using explicit stack of item iterators
+    # instead of recursion so deep configs don't hit the recursion limit. Items
+    # are iterated live without taking a copy: only values get replaced during
+    # the walk (keys are only added by '_copy' before a node is iterated) and we
+    # want to see values already resolved by nested lookups.
+    stack = [(cur, cur_path, iter(cur.items()))]
+    on_stack = {id(cur)} # dicts being walked, to detect nodes copied in to themselves
+    while stack:
+        cur, cur_path, items = stack[-1]
+        for k, v in items:
+            # if this key needs path resolution, get target and replace the value,
+            # most values are not strings so cheap exact type check goes first
+            if type(v) is str:
+                rpath = _req_resolve(v)
+                if rpath:
+                    v = cur[k] = _resolve_path(root_d,
+                                    _rel2full_path(cur_path + (k,), rpath),
+                                    in_progress, completed, memo)
+            # if replaced value is again dictionary, descend in to it
+            if isinstance(v, MutableMapping):
+                if id(v) in on_stack:
+                    raise RuntimeError(f'Cannot resolve path "{_path_str(cur_path)}" because it is circular reference')
+                child_path = cur_path + (k,)
+                if _enter_node(root_d, v, child_path, in_progress, completed, memo):
+                    stack.append((v, child_path, iter(v.items())))
+                    on_stack.add(id(v))
+                    break
+        else:
+            # all keys of this node are done
+            stack.pop()
+            on_stack.discard(id(cur))
+            in_progress.discard(cur_path)
+            completed.add(cur_path)
+
+def _enter_node(root_d:MutableMapping, cur:MutableMapping, cur_path:_Path,
+                in_progress:set, completed:set, memo:dict)->bool:
+    """Marks node as in progress and executes its '_copy' command if any. Returns
+    False if node should not be walked because it is already being or has been resolved."""
+
+    if cur_path in completed:
+        return False # already fully resolved
+    if cur_path in in_progress:
+        return False # else we get in to infinite recursion
+
+    # leaf nodes with only non-string values, such as numeric hyperparameters,
+    # have nothing to resolve so skip walking them
+    if _PREFIX_NODE not in cur and \
+            not any(type(v) is str or isinstance(v, MutableMapping) for v in cur.values()):
+        completed.add(cur_path)
+        return False
+
+    in_progress.add(cur_path)
 
     # if cur dict has '_copy' node with path in it
     child_path = cur.get(_PREFIX_NODE, None)
     if child_path and isinstance(child_path, str):
         # resolve this path to get source dict
-        child_d = _resolve_path(root_d, _rel2full_path(cur_path, child_path), prev_paths)
+        child_d = _resolve_path(root_d, _rel2full_path(cur_path, child_path),
+                                in_progress, completed, memo)
         # we expect target path to point to dict so we can merge its keys
         if not isinstance(child_d, Mapping):
             raise RuntimeError(f'Path "{child_path}" should be dictionary but its instead "{child_d}"')
@@ -32,124 +90,125 @@ def _resolve_all(root_d:MutableMapping, cur:MutableMapping, cur_path:str, prev_p
         # remove command key
         del cur[_PREFIX_NODE]
 
-    for k in cur.keys():
-        # if this key needs path resolution, get target and replace the value
-        rpath = _req_resolve(cur[k])
-        if rpath:
-            cur[k] = _resolve_path(root_d,
-                        _rel2full_path(_join_path(cur_path, k), rpath), prev_paths)
-        # if replaced value is again dictionary, recurse on it
-        if isinstance(cur[k], MutableMapping):
-            _resolve_all(root_d, cur[k], _join_path(cur_path, k), prev_paths)
+    return True
 
 def _merge_source(source:Mapping, dest:MutableMapping)->None:
-    # for anything that source has but dest doesn't, just do copy
-    for sk in source:
-        if sk not in dest:
-            dest[sk] = source[sk]
+    # merge child nodes depth first using explicit stack instead of recursion
+    stack = [(source, dest, iter(source.items()))]
+    on_stack = {(id(source), id(dest))} # to detect nodes that contain themselves
+    while stack:
+        source, dest, items = stack[-1]
+        # for anything that source has but dest doesn't, just do copy
+        for sk, sv in items:
+            if sk not in dest:
+                dest[sk] = sv
+            else:
+                dv = dest[sk]
+
+                # merge child nodes, configs are almost always plain dicts so
+                # exact type check goes first to avoid slower isinstance on ABCs
+                if (type(sv) is dict or isinstance(sv, Mapping)) and \
+                        (type(dv) is dict or isinstance(dv, MutableMapping)):
+                    if (id(sv), id(dv)) in on_stack:
+                        raise RuntimeError(f'Cannot merge key "{sk}" because it is circular reference')
+                    stack.append((sv, dv, iter(sv.items())))
+                    on_stack.add((id(sv), id(dv)))
+                    break
+                # else at least dest value is not dict and should not be overriden
         else:
-            sv = source[sk]
-            dv = dest[sk]
-
-            # recursively merge child nodes
-            if isinstance(sv, Mapping) and isinstance(dv, MutableMapping):
-                _merge_source(source[sk], dest[sk])
-            # else at least dest value is not dict and should not be overriden
+            stack.pop()
+            on_stack.discard((id(source), id(dest)))
 
 def _req_resolve(v:Any)->Optional[str]:
     """If the value is actually a path we need resolve then return that path or return None"""
-    if isinstance(v, str) and v.startswith(_PREFIX_PATH):
+    # exact type check is cheaper than isinstance and config values are plain str
+    if type(v) is str and v.startswith(_PREFIX_PATH):
         # we will almost always have space after _copy command
-        return v[len(_PREFIX_PATH):].strip()
+        return v[_PREFIX_PATH_LEN:].strip()
     return None
 
-def _join_path(path1:str, path2:str):
-    mid = 1 if path1.endswith('/') else 0
-    mid += 1 if path2.startswith('/') else 0
-
-    # only 3 possibilities
-    if mid==0:
-        res = path1 + '/' + path2
-    elif mid==1:
-        res = path1 + path2
-    else:
-        res = path1[:-1] + path2
-
-    return _norm_ended(res)
+def _path_str(path:_Path)->str:
+    """Converts internal path to '/a/b' form for messages"""
+    return '/' + '/'.join(str(part) for part in path)
 
-def _norm_ended(path:str)->str:
-    if len(path) > 1 and path.endswith('/'):
-        path = path[:-1]
-    return path
+@lru_cache(maxsize=4096)
+def _parse_path(path:str)->Tuple[bool, int, Tuple[str, ...]]:
+    """Parses path string in a single pass and returns whether it is absolute, how
+    many levels it goes up from cwd and the parts that follow. Blanks and single
+    dots are removed and '..' after a part cancels it, so 'b/../../c' gives
+    (False, 1, ('c',)). Memoized as same paths are parsed over and over during
+    resolution."""
 
-def is_proper_path(path:str)->bool:
-    return path.startswith('/') and (len(path)==1 or not path.endswith('/'))
-
-def _rel2full_path(cwd:str, rel_path:str)->str:
-    """Given current directory and path, we return abolute path. For example,
-    cwd='/a/b/c' and rel_path='../d/e' should return '/a/b/d/e'. Note that rel_path
-    can hold absolute path in which case it will start with '/'
-    """
-    assert len(cwd) > 0 and cwd.startswith('/'), 'cwd must be absolute path'
-
-    rel_parts = rel_path.split('/')
-    if rel_path.startswith('/'):
-        cwd_parts = [] # rel_path is absolute path so ignore cwd
-    else:
-        cwd_parts = cwd.split('/')
-    full_parts = cwd_parts + rel_parts
-
-    final = []
-    for i in range(len(full_parts)):
-        part = full_parts[i].strip()
+    n_up, parts = 0, []
+    for part in path.split('/'):
+        part = part.strip()
         if not part or part == '.': # remove blank strings and single dots
             continue
         if part == '..':
-            if len(final):
-                final.pop()
+            if parts:
+                parts.pop()
             else:
-                raise RuntimeError(f'cannot create abs path for cwd={cwd} and rel_path={rel_path}')
+                n_up += 1
         else:
-            final.append(part)
-
-    final = '/' + '/'.join(final)  # should work even when final is empty
-    assert not '..' in final and is_proper_path(final) # make algo indeed worked
-    return final
-
-
-def _resolve_path(root_d:MutableMapping, path:str, prev_paths:set)->Any:
-    """For given path returns value or node from root_d"""
+            parts.append(part)
+    return path.startswith('/'), n_up, tuple(parts)
 
-    assert is_proper_path(path)
+def _rel2full_path(cwd:_Path, rel_path:str)->_Path:
+    """Given current directory and path, we return abolute path. For example,
+    cwd=('a', 'b', 'c') and rel_path='../d/e' should return ('a', 'b', 'd', 'e').
+    Note that rel_path can hold absolute path in which case it will start with '/'
+    """
 
-    # traverse path in root dict hierarchy
-    cur_path = '/' # path at each iteration of for loop
-    d = root_d
-    for part in path.split('/'):
-        if not part:
-            continue # there will be blank vals at start
-
-        # For each part, we need to be able find key in dict but some dics may not
-        # be fully resolved yet. For last key, d will be either dict or other value.
-        if isinstance(d, Mapping):
-            # for this section, make sure everything is resolved
-            # before we prob for the key
-            _resolve_all(root_d, d, cur_path, prev_paths)
-
-            if part in d:
-                # "cd" into child node
-                d = d[part]
-                cur_path = _join_path(cur_path, part)
+    is_abs, n_up, rel_parts = _parse_path(rel_path)
+
+    if not n_up:
+        return rel_parts if is_abs else cwd + rel_parts
+
+    # for absolute rel_path there is nothing above root to go to
+    if is_abs or n_up > len(cwd):
+        raise RuntimeError(f'cannot create abs path for cwd={_path_str(cwd)} and rel_path={rel_path}')
+    return cwd[:len(cwd) - n_up] + rel_parts
+
+
+def _resolve_path(root_d:MutableMapping, path:_Path, in_progress:set, completed:set,
+                  memo:dict)->Any:
+    """For given path returns value or node from root_d. Results are cached in memo
+    so each path is traversed only once per resolve_all call."""
+
+    chain = [] # paths visited while following chain of copy commands
+    while True:
+        if path in memo:
+            d = memo[path]
+            break
+        chain.append(path)
+
+        # traverse path in root dict hierarchy
+        d = root_d
+        for i, part in enumerate(path):
+            # For each part, we need to be able find key in dict but some dics may not
+            # be fully resolved yet. For last key, d will be either dict or other value.
+            if isinstance(d, Mapping):
+                # for this section, make sure everything is resolved
+                # before we prob for the key
+                _resolve_all(root_d, d, path[:i], in_progress, completed, memo)
+
+                if part in d:
+                    # "cd" into child node
+                    d = d[part]
+                else:
+                    raise RuntimeError(f'Path {_path_str(path)} could not be found in specified dictionary at "{part}"')
             else:
-                raise RuntimeError(f'Path {path} could not be found in specified dictionary at "{part}"')
-        else:
-            raise KeyError(f'Path "{path}" cannot be resolved because "{cur_path}" is not a dictionary so "{part}" cannot exist in it')
-
-    # last child is our answer
-    rpath = _req_resolve(d)
-    if rpath:
-        next_path = _rel2full_path(cur_path, rpath)
-        if next_path == path:
-            raise RuntimeError(f'Cannot resolve path "{path}" because it is circular reference')
-        d = _resolve_path(root_d, next_path, prev_paths)
-    return d
\ No newline at end of file
+                raise KeyError(f'Path "{_path_str(path)}" cannot be resolved because "{_path_str(path[:i])}" is not a dictionary so "{part}" cannot exist in it')
+
+        # if last child is another copy command then follow it, else it's our answer
+        rpath = _req_resolve(d)
+        if not rpath:
+            break
+        next_path = _rel2full_path(path, rpath)
+        if next_path in chain:
+            raise RuntimeError(f'Cannot resolve path "{_path_str(path)}" because it is circular reference')
+        path = next_path
+
+    for p in chain:
+        memo[p] = d
+    return d
@@ -10,8 +10,6 @@ import torch
 
 from archai.common.file_utils import get_full_path
 from archai.common.ordered_dict_logger import OrderedDictLogger
-from archai.datasets.nlp.tokenizer_utils.bbpe_tokenizer import BbpeTokenizer
-from archai.datasets.nlp.tokenizer_utils.gpt2_tokenizer import Gpt2Tokenizer
 from archai.datasets.nlp.tokenizer_utils.tokenizer_base import TokenizerBase
 from archai.datasets.nlp.tokenizer_utils.word_tokenizer import WordTokenizer
 
@@ -103,9 +101,15 @@ class Corpus:
             )
 
         elif vocab_type == "bbpe":
+            # BPE-based tokenizers depend on `tokenizers` and `transformers`, which are
+            # slow to import, so they are only loaded when actually requested
+            from archai.datasets.nlp.tokenizer_utils.bbpe_tokenizer import BbpeTokenizer
+
             vocab = BbpeTokenizer(save_path=vocab_cache_dir, vocab_size=vocab_size or 50257)
 
         elif vocab_type == "gpt2":
+            from archai.datasets.nlp.tokenizer_utils.gpt2_tokenizer import Gpt2Tokenizer
+
             # Default vocab_size for GPT-2 is 50257
             vocab = Gpt2Tokenizer(save_path=vocab_cache_dir, vocab_size=vocab_size or 50257)
 
@@ -8,6 +8,9 @@ from torch import nn
 
 from archai.discrete_search.api.archai_model import ArchaiModel
 from archai.discrete_search.api.model_evaluator import ModelEvaluator
+from archai.discrete_search.evaluators.pt_profiler_utils.pt_profiler_params import (
+    count_parameters,
+)
 
 
 class NonEmbeddingParamsProxy(ModelEvaluator):
@@ -34,14 +37,6 @@ class NonEmbeddingParamsProxy(ModelEvaluator):
 
     @overrides
     def evaluate(self, model: ArchaiModel, budget: Optional[float] = None) -> float:
-        total_params = sum(
-            param.numel() for param in model.arch.parameters() if not self.trainable_only or param.requires_grad
-        )
-
-        embed_params = sum(
-            sum(param.numel() for param in module.parameters())
-            for module in model.arch.modules()
-            if isinstance(module, tuple(self.exclude_cls))
-        )
+        total_params, embed_params = count_parameters(model.arch, self.exclude_cls, self.trainable_only)
 
         return total_params - embed_params
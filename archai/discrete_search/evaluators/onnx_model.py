@@ -3,7 +3,6 @@
 
 from typing import Any, Dict, List, Optional, Tuple, Union
 
-import onnxruntime as rt
 import torch
 from overrides import overrides
 
@@ -63,6 +62,10 @@ class AvgOnnxLatency(ModelEvaluator):
 
     @overrides
     def evaluate(self, model: ArchaiModel, budget: Optional[float] = None) -> float:
+        # Imported here so that loading `archai.discrete_search.evaluators` for the
+        # PyTorch-based evaluators does not require loading ONNX Runtime
+        import onnxruntime as rt
+
         model.arch.to("cpu")
 
         # Exports model to ONNX
@@ -9,6 +9,9 @@ from overrides import overrides
 from archai.discrete_search.api.archai_model import ArchaiModel
 from archai.discrete_search.api.model_evaluator import ModelEvaluator
 from archai.discrete_search.evaluators.pt_profiler_utils.pt_profiler_eval import profile
+from archai.discrete_search.evaluators.pt_profiler_utils.pt_profiler_params import (
+    count_parameters,
+)
 
 
 class TorchNumParameters(ModelEvaluator):
@@ -30,19 +33,7 @@ class TorchNumParameters(ModelEvaluator):
 
     @overrides
     def evaluate(self, model: ArchaiModel, budget: Optional[float] = None) -> float:
-        total_params = sum(
-            param.numel() for param in model.arch.parameters() if not self.trainable_only or param.requires_grad
-        )
-
-        exclude_params = (
-            0
-            if self.exclude_cls is None
-            else sum(
-                sum(param.numel() for param in module.parameters())
-                for module in model.arch.modules()
-                if isinstance(module, tuple(self.exclude_cls))
-            )
-        )
+        total_params, exclude_params = count_parameters(model.arch, self.exclude_cls, self.trainable_only)
 
         return total_params - exclude_params
 
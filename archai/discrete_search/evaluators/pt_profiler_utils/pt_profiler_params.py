@@ -0,0 +1,56 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+from typing import List, Optional, Tuple
+
+import torch
+
+
+def count_parameters(
+    model: torch.nn.Module,
+    exclude_cls: Optional[List[torch.nn.Module]] = None,
+    trainable_only: Optional[bool] = True,
+) -> Tuple[int, int]:
+    """Count the total and excluded number of parameters of a PyTorch model.
+
+    Both counts are computed in a single walk over the modules, where shared
+    parameters (e.g., tied weights) are only counted once.
+
+    Args:
+        model: PyTorch model.
+        exclude_cls: List of PyTorch module classes whose parameters should be counted as excluded.
+        trainable_only: Whether only trainable parameters should be counted towards the total.
+
+    Returns:
+        Total number of parameters and number of parameters that belong to excluded modules.
+
+    """
+
+    exclude_cls = tuple(exclude_cls or [])
+
+    total_params, excluded_params = 0, 0
+    seen_params, seen_excluded_params = set(), set()
+
+    # Modules are visited along with whether they are nested in an excluded module
+    modules = [(model, False)]
+
+    while modules:
+        module, is_excluded = modules.pop()
+        is_excluded = is_excluded or isinstance(module, exclude_cls)
+
+        for param in module.parameters(recurse=False):
+            param_id = id(param)
+
+            if param_id not in seen_params:
+                seen_params.add(param_id)
+
+                if not trainable_only or param.requires_grad:
+                    total_params += param.numel()
+
+            if is_excluded and param_id not in seen_excluded_params:
+                seen_excluded_params.add(param_id)
+                excluded_params += param.numel()
+
+        modules.extend((child, is_excluded) for child in module.children())
+
+    return total_params, excluded_params
@@ -25,6 +25,9 @@ class NatsbenchTssSearchSpace(EvolutionarySearchSpace, BayesOptSearchSpace):
 
     OPS = ["none", "avg_pool_3x3", "nor_conv_1x1", "nor_conv_3x3", "skip_connect"]
 
+    # Row `i` encodes `OPS[i]` as one-hot over `OPS[1:]`, so "none" is encoded with zeros
+    _OP_ENCODING = np.eye(len(OPS), dtype=int)[:, 1:]
+
     try:
         from xautodl.models import get_cell_based_tiny_net
     except ImportError:
@@ -181,14 +184,6 @@ class NatsbenchTssSearchSpace(EvolutionarySearchSpace, BayesOptSearchSpace):
 
     @overrides
     def encode(self, arch: ArchaiModel) -> np.ndarray:
-        enc_dict = {
-            "none": [0, 0, 0, 0],
-            "avg_pool_3x3": [1, 0, 0, 0],
-            "nor_conv_1x1": [0, 1, 0, 0],
-            "nor_conv_3x3": [0, 0, 1, 0],
-            "skip_connect": [0, 0, 0, 1],
-        }
-
         # Gets string repr for `arch`
         natsbenchid = self.archid_pattern.match(arch.archid)
         if not natsbenchid:
@@ -197,4 +192,4 @@ class NatsbenchTssSearchSpace(EvolutionarySearchSpace, BayesOptSearchSpace):
         arch_str = self.api[int(natsbenchid.group(1))]
         arch_ops = re.findall(r"([^\|\~\+]+)~\d", arch_str)
 
-        return np.hstack([np.array(enc_dict[op_name]) for op_name in arch_ops])
+        return self._OP_ENCODING[[self.OPS.index(op_name) for op_name in arch_ops]].ravel()
@@ -1,7 +1,6 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
-import itertools
 from collections import OrderedDict
 from copy import deepcopy
 from functools import reduce
@@ -13,7 +12,7 @@ from archai.discrete_search.search_spaces.config.arch_config import (
     build_arch_config,
 )
 from archai.discrete_search.search_spaces.config.discrete_choice import DiscreteChoice
-from archai.discrete_search.search_spaces.config.utils import flatten_dict, replace_ptree_choices, order_dict_keys
+from archai.discrete_search.search_spaces.config.utils import flatten_dict, replace_ptree_choices
 
 
 class ArchParamTree:
@@ -157,24 +156,21 @@ class ArchParamTree:
         deduped_features = self.to_dict(flatten=True, deduplicate_params=True, remove_constants=True)
 
         flat_config = flatten_dict(config._config_dict)
-        flat_used_params = flatten_dict(config.get_used_params())
-
-        # Reorder `flat_config` and `flat_used_params` to follow the order of `deduped_features`
-        flat_config = order_dict_keys(deduped_features, flat_config)
-        flat_used_params = order_dict_keys(deduped_features, flat_used_params)
-
-        # Build feature array
-        features = OrderedDict([
-            (k, deduped_features[k].encode(v)) 
-            for k, v in flat_config.items() 
-            if k in deduped_features
-        ])
-
-        # Replaces unused params with NaNs if necessary
-        if track_unused_params:
-            for feature_name, enc_param in features.items():
-                if not flat_used_params[feature_name]:
-                    features[feature_name] = [float("NaN") for _ in enc_param]
-
-        # Flattens the feature array
-        return list(itertools.chain(*features.values()))
+        flat_used_params = flatten_dict(config.get_used_params()) if track_unused_params else None
+
+        # Builds the flat feature array following the order of `deduped_features`,
+        # replacing unused params with NaNs if necessary
+        features = []
+
+        for feature_name, d_choice in deduped_features.items():
+            if feature_name not in flat_config:
+                continue
+
+            enc_param = d_choice.encode(flat_config[feature_name])
+
+            if track_unused_params and not flat_used_params[feature_name]:
+                enc_param = [float("NaN")] * len(enc_param)
+
+            features.extend(enc_param)
+
+        return features
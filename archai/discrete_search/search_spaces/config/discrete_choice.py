@@ -60,7 +60,10 @@ class DiscreteChoice:
 
         if self.encode_strategy == 'one_hot':
             assert option in self.choices, f'Invalid option: {option}. Valid options: {self.choices}'
-            return [float(choice == option) for choice in self.choices]
+
+            encoded = [0.0] * len(self.choices)
+            encoded[self.choices.index(option)] = 1.0
+            return encoded
         
         return [float(option)]
 
@@ -2,6 +2,7 @@
 # Licensed under the MIT license.
 
 import hashlib
+from collections import OrderedDict
 from random import Random
 from typing import Any, Callable, Dict, List, Optional, Type, Union
 
@@ -21,6 +22,9 @@ from archai.discrete_search.search_spaces.config.arch_config import (
 )
 from archai.discrete_search.search_spaces.config.arch_param_tree import ArchParamTree
 
+# Maximum number of encodings kept by `ConfigSearchSpace`
+_ENCODE_CACHE_SIZE = 4096
+
 
 class ConfigSearchSpace(EvolutionarySearchSpace, BayesOptSearchSpace):
     def __init__(
@@ -67,6 +71,9 @@ class ConfigSearchSpace(EvolutionarySearchSpace, BayesOptSearchSpace):
 
         self.rng = Random(seed)
 
+        # LRU cache that maps architecture identifiers produced by `get_archid` to their encodings
+        self._encode_cache = OrderedDict()
+
     def get_archid(self, arch_config: ArchConfig) -> str:
         """Return the architecture identifier for the given architecture configuration.
 
@@ -78,12 +85,18 @@ class ConfigSearchSpace(EvolutionarySearchSpace, BayesOptSearchSpace):
 
         """
 
-        archid = self.arch_param_tree.encode_config(arch_config, track_unused_params=self.track_unused_params)
-        archid = str(tuple(archid))
+        encoded_config = self.arch_param_tree.encode_config(arch_config, track_unused_params=self.track_unused_params)
+        archid = str(tuple(encoded_config))
 
         if self.hash_archid:
             archid = hashlib.sha1(archid.encode("utf-8")).hexdigest()
 
+        # Keeps the raw encoding so `encode` does not need to recompute it
+        self._encode_cache[archid] = encoded_config
+        self._encode_cache.move_to_end(archid)
+        if len(self._encode_cache) > _ENCODE_CACHE_SIZE:
+            self._encode_cache.popitem(last=False)
+
         return archid
 
     @overrides
@@ -158,11 +171,16 @@ class ConfigSearchSpace(EvolutionarySearchSpace, BayesOptSearchSpace):
 
     @overrides
     def encode(self, model: ArchaiModel) -> np.ndarray:
-        encoded_config = np.array(
-            self.arch_param_tree.encode_config(
+        # Only encodings stored by `get_archid` are served, since their archids are derived
+        # from the encoding itself. Models created elsewhere are always encoded from their config
+        encoded_config = self._encode_cache.get(model.archid)
+
+        if encoded_config is not None:
+            self._encode_cache.move_to_end(model.archid)
+        else:
+            encoded_config = self.arch_param_tree.encode_config(
                 model.metadata["config"],
                 track_unused_params=self.track_unused_params
             )
-        )
 
-        return np.nan_to_num(encoded_config, nan=self.unused_param_value)
+        return np.nan_to_num(np.array(encoded_config), nan=self.unused_param_value)
@@ -37,25 +37,6 @@ def flatten_dict(odict: Dict[str, Any]) -> dict:
     return fdict
 
 
-def order_dict_keys(base_dict: OrderedDict, target_dict: Dict[str, Any]) -> OrderedDict:
-    """Order the keys of a target dictionary based on a base dictionary.
-
-    Args:
-        base_dict (OrderedDict[str, Any]): Dictionary with the desired key order.
-        target_dict (Dict[str, Any]): Dictionary to be ordered.
-
-    Returns:
-        OrderedDict[str, Any]: Ordered version of `target_dict` dictionary.
-    """
-    ordered_dict = OrderedDict()
-
-    for k in base_dict:
-        if k in target_dict:
-            ordered_dict[k] = target_dict[k]
-
-    return ordered_dict
-
-
 def replace_ptree_choices(
     config_tree: Union[Dict, DiscreteChoice], repl_fn: Callable[[DiscreteChoice], Any]
 ) -> OrderedDict:
@@ -87,6 +87,9 @@ class SegmentationDagModel(torch.nn.Module):
         # Classifier
         self.classifier = nn.Conv2d(stem_ch, self.nb_classes, kernel_size=1)
 
+        # Architecture hash, computed on the first call to `to_hash`
+        self._hash = None
+
     @classmethod
     def _get_channels_per_scale(
         cls,
@@ -343,12 +346,18 @@ class SegmentationDagModel(torch.nn.Module):
     def to_hash(self) -> str:
         """Generates a hash for the model.
 
+        The hash is computed once and cached, since the architecture is not
+        modified after the model is created.
+
         Returns:
             A hash string.
 
         """
 
-        config = self.to_config()
-        arch_str = json.dumps(config, sort_keys=True, ensure_ascii=True)
+        if self._hash is None:
+            config = self.to_config()
+            arch_str = json.dumps(config, sort_keys=True, ensure_ascii=True)
+
+            self._hash = sha1(arch_str.encode("ascii")).hexdigest() + f"_{self.img_size[0]}_{self.img_size[1]}"
 
-        return sha1(arch_str.encode("ascii")).hexdigest() + f"_{self.img_size[0]}_{self.img_size[1]}"
+        return self._hash
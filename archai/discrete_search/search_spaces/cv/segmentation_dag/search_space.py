@@ -1,10 +1,13 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
-import copy
 import sys
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing, contextmanager
 from random import Random
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import numpy as np
 import tensorwatch as tw
@@ -22,6 +25,11 @@ from archai.discrete_search.search_spaces.cv.segmentation_dag.model import (
 logger = OrderedDictLogger(source=__name__)
 
 
+def _clone_graph(node_list: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # Nodes only hold scalars and an inputs list, so copying both levels is enough
+    return [{**node, "inputs": list(node["inputs"]) if node["inputs"] is not None else None} for node in node_list]
+
+
 class SegmentationDagSearchSpace(EvolutionarySearchSpace):
     """Search space for segmentation DAGs."""
 
@@ -48,6 +56,7 @@ class SegmentationDagSearchSpace(EvolutionarySearchSpace):
         op_subset: Optional[str] = None,
         mult_delta: Optional[bool] = False,
         seed: Optional[int] = 1,
+        nb_workers: Optional[int] = 1,
     ) -> None:
         """Initialize the search space.
 
@@ -73,6 +82,7 @@ class SegmentationDagSearchSpace(EvolutionarySearchSpace):
             op_subset: Subset of operations to use.
             mult_delta: Whether to multiply delta channels.
             seed: Seed for random number generator.
+            nb_workers: Number of threads used to validate sampled architectures concurrently.
 
         """
 
@@ -120,8 +130,17 @@ class SegmentationDagSearchSpace(EvolutionarySearchSpace):
         self.downsample_prob_ratio = downsample_prob_ratio
         self.img_size = img_size
 
+        # Probe input used to validate forward passes, which only depend on its shape
+        self._probe_input = torch.randn(1, 3, *self.img_size[::-1])
+
         self.rng = Random(seed)
 
+        self.nb_workers = nb_workers
+        assert self.nb_workers >= 1
+
+        # Maps architecture hashes to their `is_valid_model` results
+        self._is_valid_cache = {}
+
     def is_valid_model(self, model: torch.nn.Module) -> Tuple[bool, int]:
         """Check if a model is valid and falls inside of the specified MAdds range.
 
@@ -133,19 +152,37 @@ class SegmentationDagSearchSpace(EvolutionarySearchSpace):
 
         """
 
+        # Architectures are often sampled more than once, so the forward and
+        # MAdds passes are only run for architectures that were not seen before
+        arch_hash = model.to_hash()
+        if arch_hash in self._is_valid_cache:
+            return self._is_valid_cache[arch_hash]
+
         is_valid = True
 
         try:
-            model.validate_forward(torch.randn(1, 3, *self.img_size[::-1]))
+            with torch.no_grad():
+                model.validate_forward(self._probe_input)
         except Exception:
             is_valid = False
 
         if is_valid:
             input_tensor_shape = (1, 3, *self.img_size)
-            model_stats = tw.ModelStats(model, input_tensor_shape, clone_model=True)
+
+            # The model is profiled in place rather than cloned, since `tw.ModelStats` removes
+            # its hooks afterwards and only leaves the model in eval mode
+            training = model.training
+
+            with torch.no_grad():
+                model_stats = tw.ModelStats(model, input_tensor_shape, clone_model=False)
+
+            model.train(training)
             is_valid = model_stats.MAdd >= self.min_mac and model_stats.MAdd <= self.max_mac
 
-        return is_valid, None if not is_valid else model_stats.MAdd
+        result = is_valid, None if not is_valid else model_stats.MAdd
+        self._is_valid_cache[arch_hash] = result
+
+        return result
 
     def load_from_graph(
         self, graph: List[Dict[str, Any]], channels_per_scale: Dict[str, Any], post_upsample_layers: Optional[int] = 1
@@ -172,7 +209,7 @@ class SegmentationDagSearchSpace(EvolutionarySearchSpace):
         """Sample a random neighbor from an element of a list.
 
         Args:
-            param_values: List of values.
+            param_values: List of values, sorted in ascending order.
             current_value: Current value.
 
         Returns:
@@ -180,14 +217,14 @@ class SegmentationDagSearchSpace(EvolutionarySearchSpace):
 
         """
 
-        param_values = sorted(copy.deepcopy(param_values))
-        param2idx = {param: idx for idx, param in enumerate(param_values)}
-
-        # Gets the index of the closest value to the current value
-        if current_value in param2idx:
-            current_idx = param2idx[current_value]
-        else:
-            current_idx = param2idx[min(param2idx, key=lambda k: abs(k - current_value))]
+        # Gets the index of the closest value to the current value (ties go to the lower value)
+        current_idx = bisect_left(param_values, current_value)
+        if current_idx == len(param_values) or (
+            current_idx > 0
+            and param_values[current_idx] != current_value
+            and current_value - param_values[current_idx - 1] <= param_values[current_idx] - current_value
+        ):
+            current_idx -= 1
 
         offset = self.rng.randint(a=-1 if current_idx > 0 else 0, b=1 if current_idx < len(param_values) - 1 else 0)
 
@@ -213,15 +250,19 @@ class SegmentationDagSearchSpace(EvolutionarySearchSpace):
 
         """
 
-        node_list = copy.deepcopy(node_list)
         prefix = prefix + "_" if prefix else ""
 
         rename_map = {}
         if not rename_input_output:
             rename_map = {"input": "input", "output": "output"}
 
+        # Builds the renamed copies in a single pass, leaving `node_list` untouched
+        renamed_list = []
+
         for i, node in enumerate(node_list):
-            if node["name"] not in rename_map:
+            new_name = node["name"]
+
+            if new_name not in rename_map:
 
                 if add_input_output:
                     new_name = "input" if i == 0 else "output" if i == len(node_list) - 1 else prefix + f"layer_{i}"
@@ -229,14 +270,14 @@ class SegmentationDagSearchSpace(EvolutionarySearchSpace):
                     new_name = prefix + f"layer_{i}"
 
                 rename_map[node["name"]] = new_name
-                node["name"] = new_name
 
-            if node["inputs"]:
-                node["inputs"] = [
-                    rename_map[inp_name] for inp_name in node["inputs"] if inp_name and inp_name in rename_map
-                ]
+            inputs = node["inputs"]
+            if inputs is not None:
+                inputs = [rename_map[inp_name] for inp_name in inputs if inp_name and inp_name in rename_map]
+
+            renamed_list.append({**node, "name": new_name, "inputs": inputs})
 
-        return node_list
+        return renamed_list
 
     @overrides
     def save_arch(self, model: ArchaiModel, path: str) -> None:
@@ -256,151 +297,217 @@ class SegmentationDagSearchSpace(EvolutionarySearchSpace):
     def load_model_weights(self, model: ArchaiModel, path: str) -> None:
         model.arch.load_state_dict(torch.load(path))
 
-    @overrides
-    def random_sample(self) -> ArchaiModel:
-        arch = None
-
-        while not arch:
-            # randomly pick number of layers
-            nb_layers = self.rng.randint(self.min_layers, self.max_layers)
+    def _sample_model(self) -> SegmentationDagModel:
+        # randomly pick number of layers
+        nb_layers = self.rng.randint(self.min_layers, self.max_layers)
 
-            # Samples `base_channels` and `delta_channels`
-            ch_per_scale = {
-                "base_channels": self.rng.choice(self.base_channels_list),
-                "delta_channels": self.rng.choice(self.delta_channels_list),
-                "mult_delta": self.mult_delta,
-            }
+        # Samples `base_channels` and `delta_channels`
+        ch_per_scale = {
+            "base_channels": self.rng.choice(self.base_channels_list),
+            "delta_channels": self.rng.choice(self.delta_channels_list),
+            "mult_delta": self.mult_delta,
+        }
 
-            # Samples `post_upsample_layers`
-            post_upsample_layers = (
-                self.rng.choice(self.post_upsample_layers_list) if self.post_upsample_layers_list else 1
-            )
+        # Samples `post_upsample_layers`
+        post_upsample_layers = self.rng.choice(self.post_upsample_layers_list) if self.post_upsample_layers_list else 1
 
-            # Builds channels per level map using the sampled `base_channels` and `delta_channels`
-            ch_map = SegmentationDagModel._get_channels_per_scale(ch_per_scale, self.max_downsample_factor, True)
+        # Builds channels per level map using the sampled `base_channels` and `delta_channels`
+        ch_map = SegmentationDagModel._get_channels_per_scale(ch_per_scale, self.max_downsample_factor, True)
 
-            # Input node
-            graph = [{"name": "input", "inputs": None, "op": self.rng.choice(self.operations), "scale": 1}]
-            node_list = ["input"]
+        # Input node
+        graph = [{"name": "input", "inputs": None, "op": self.rng.choice(self.operations), "scale": 1}]
+        node_list = ["input"]
 
-            # Used to control `max_scale_delta`
-            idx2scale = list(ch_map.keys())
-            scale2idx = {scale: i for i, scale in enumerate(ch_map.keys())}
+        # Used to control `max_scale_delta`
+        idx2scale = list(ch_map.keys())
+        scale2idx = {scale: i for i, scale in enumerate(ch_map.keys())}
 
-            for layer in range(nb_layers):
-                is_output = layer == nb_layers - 1
-                last_layer = graph[-1]
+        for layer in range(nb_layers):
+            is_output = layer == nb_layers - 1
+            last_layer = graph[-1]
 
-                new_node = {
-                    "name": "output" if is_output else f"layer_{layer}",
-                    "op": None if is_output else self.rng.choice(self.operations),
-                    "inputs": [last_layer["name"]],
-                }
+            new_node = {
+                "name": "output" if is_output else f"layer_{layer}",
+                "op": None if is_output else self.rng.choice(self.operations),
+                "inputs": [last_layer["name"]],
+            }
 
-                # Choose scale
-                last_scale_idx = scale2idx[last_layer["scale"]]
+            # Choose scale
+            last_scale_idx = scale2idx[last_layer["scale"]]
 
-                # Samples a delta value for the current scale index
-                scale_options = list(
-                    range(
-                        max(-self.max_scale_delta, -last_scale_idx),
-                        1 + min(self.max_scale_delta, len(ch_map) - last_scale_idx - 1),
-                    )
+            # Samples a delta value for the current scale index
+            scale_options = list(
+                range(
+                    max(-self.max_scale_delta, -last_scale_idx),
+                    1 + min(self.max_scale_delta, len(ch_map) - last_scale_idx - 1),
                 )
+            )
 
-                sample_weights = np.array([1 if delta < 0 else self.downsample_prob_ratio for delta in scale_options])
-                scale_delta = self.rng.choices(scale_options, k=1, weights=sample_weights)[0]
+            sample_weights = np.array([1 if delta < 0 else self.downsample_prob_ratio for delta in scale_options])
+            scale_delta = self.rng.choices(scale_options, k=1, weights=sample_weights)[0]
 
-                # Assigns the new scale to the new node
-                new_node["scale"] = idx2scale[last_scale_idx + scale_delta]
+            # Assigns the new scale to the new node
+            new_node["scale"] = idx2scale[last_scale_idx + scale_delta]
 
-                # Choose inputs
-                if len(node_list) > 1:
-                    for i in range(2, 1 + self.rng.randint(2, min(len(node_list), self.max_skip_connection_length))):
-                        if self.skip_connections and self.rng.random() < 0.5:
-                            new_node["inputs"].append(node_list[-i])
+            # Choose inputs
+            if len(node_list) > 1:
+                for i in range(2, 1 + self.rng.randint(2, min(len(node_list), self.max_skip_connection_length))):
+                    if self.skip_connections and self.rng.random() < 0.5:
+                        new_node["inputs"].append(node_list[-i])
 
-                # Adds node
-                graph.append(new_node)
-                node_list.append(new_node["name"])
+            # Adds node
+            graph.append(new_node)
+            node_list.append(new_node["name"])
 
-            # Builds model
-            model = SegmentationDagModel(
-                graph, ch_per_scale, post_upsample_layers, img_size=self.img_size, nb_classes=self.nb_classes
-            )
+        return SegmentationDagModel(
+            graph, ch_per_scale, post_upsample_layers, img_size=self.img_size, nb_classes=self.nb_classes
+        )
 
-            found_valid, macs = self.is_valid_model(model)
+    def _scaled_macs_bounds(self, base_model: ArchaiModel, channels_per_scale: Dict[str, Any]) -> Tuple[float, float]:
+        # Rescaling the channels of each scale by `r` scales the total MAdds by roughly
+        # `min(1, r) ** 2` to `max(1, r) ** 2`. These bounds are not strict: tensorwatch counts
+        # a conv as `(2 * k ** 2 * cin - 1) * cout * HW`, whose negative linear term makes the
+        # scaling slightly exceed `r ** 2` for `r > 1`, so callers must add a safety margin
+        base_ch_map = base_model.arch.channels_per_scale
+        ch_map = SegmentationDagModel._get_channels_per_scale(channels_per_scale)
+        ratios = [ch_map[scale] / base_ch for scale, base_ch in base_ch_map.items() if isinstance(scale, int)]
+
+        macs = base_model.metadata["macs"]
+        return macs * min(1.0, *ratios) ** 2, macs * max(1.0, *ratios) ** 2
+
+    def _mutate_model(self, base_model: ArchaiModel, out_degree: Counter) -> Optional[SegmentationDagModel]:
+        graph = _clone_graph(base_model.arch.graph.values())
+        channels_per_scale = base_model.arch.channels_per_scale
+
+        # sanity check the graph
+        assert len(graph) > 1
+        assert graph[-1]["name"] == "output"
+        assert graph[0]["name"] == "input"
+
+        # `base_channels` and `delta_channels` mutation
+        channels_per_scale = {
+            "base_channels": self.random_neighbor(self.base_channels_list, channels_per_scale["base_channels"]),
+            "delta_channels": self.random_neighbor(self.delta_channels_list, channels_per_scale["delta_channels"]),
+            "mult_delta": self.mult_delta,
+        }
+
+        # `post_upsample_layers` mutation
+        post_upsample_layers = self.random_neighbor(
+            self.post_upsample_layers_list, base_model.arch.post_upsample_layers
+        )
 
-            if found_valid:
-                arch = ArchaiModel(model, model.to_hash(), {"parent": None, "macs": macs})
+        # pick a node at random (but not input node)
+        # and change its operator at random
+        # and its input sources
+        chosen_node_idx = self.rng.randint(1, len(graph) - 1)
+        node = graph[chosen_node_idx]
+
+        if node["name"] != "output":
+            node["op"] = self.rng.choice(self.operations)
+
+        # choose up to k inputs from previous nodes
+        max_inputs = 3  # TODO: make config
+
+        if node["name"] != "input":
+            k = min(chosen_node_idx, self.rng.randint(1, max_inputs))
+            input_idxs = self.rng.sample(range(chosen_node_idx), k)
+
+            # Removes everything except inputs that have out degree == 1
+            # (a dictionary is used as an insertion-ordered set)
+            inputs = dict.fromkeys(input for input in node["inputs"] if out_degree[input] <= 1)
+
+            # Adds `k` new inputs
+            inputs.update(dict.fromkeys(graph[idx]["name"] for idx in input_idxs))
+            node["inputs"] = list(inputs)
+
+        # When only the channels changed, the parent's MAdds approximately bound the neighbor's MAdds,
+        # so neighbors that are out of range even with a safety margin are discarded before being built
+        base_node = base_model.arch.graph[node["name"]]
+        same_topology = (
+            node["op"] == base_node["op"]
+            and node["inputs"] == base_node["inputs"]
+            and post_upsample_layers == base_model.arch.post_upsample_layers
+        )
 
-        return arch
+        if same_topology and base_model.metadata.get("macs") is not None:
+            lower, upper = self._scaled_macs_bounds(base_model, channels_per_scale)
 
-    @overrides
-    def mutate(self, base_model: ArchaiModel, patience: Optional[int] = 5) -> ArchaiModel:
-        parent_id = base_model.archid
-        nb_tries = 0
+            # 20% safety margin, since the bounds ignore terms that are linear in the channels
+            if upper * 1.2 < self.min_mac or lower * 0.8 > self.max_mac:
+                return None
 
-        while nb_tries < patience:
-            nb_tries += 1
-            graph = copy.deepcopy(list(base_model.arch.graph.values()))
-            channels_per_scale = copy.deepcopy(base_model.arch.channels_per_scale)
-
-            # sanity check the graph
-            assert len(graph) > 1
-            assert graph[-1]["name"] == "output"
-            assert graph[0]["name"] == "input"
-
-            # `base_channels` and `delta_channels` mutation
-            channels_per_scale = {
-                "base_channels": self.random_neighbor(self.base_channels_list, channels_per_scale["base_channels"]),
-                "delta_channels": self.random_neighbor(self.delta_channels_list, channels_per_scale["delta_channels"]),
-                "mult_delta": self.mult_delta,
-            }
+        return SegmentationDagModel(
+            graph, channels_per_scale, post_upsample_layers, img_size=self.img_size, nb_classes=self.nb_classes
+        )
 
-            # `post_upsample_layers` mutation
-            post_upsample_layers = self.random_neighbor(
-                self.post_upsample_layers_list, base_model.arch.post_upsample_layers
-            )
+    @contextmanager
+    def _validation_executor(self) -> Iterator[Optional[ThreadPoolExecutor]]:
+        # Scoped to a single `random_sample` or `mutate` call, so no threads outlive it
+        # and the search space can still be copied or pickled
+        if self.nb_workers == 1:
+            yield None
+            return
 
-            # pick a node at random (but not input node)
-            # and change its operator at random
-            # and its input sources
-            chosen_node_idx = self.rng.randint(1, len(graph) - 1)
-            node = graph[chosen_node_idx]
+        # Exiting waits for the checks that are already running, since pending ones
+        # are cancelled when `_validate_models` is closed
+        with ThreadPoolExecutor(max_workers=self.nb_workers) as executor:
+            yield executor
+
+    def _validate_models(
+        self, models: List[SegmentationDagModel], executor: Optional[ThreadPoolExecutor] = None
+    ) -> Iterator[Tuple[bool, int]]:
+        # Yields `is_valid_model` results in the same order as `models`
+        if executor is None:
+            yield from map(self.is_valid_model, models)
+            return
 
-            if node["name"] != "output":
-                node["op"] = self.rng.choice(self.operations)
+        futures = [executor.submit(self.is_valid_model, model) for model in models]
 
-            # choose up to k inputs from previous nodes
-            max_inputs = 3  # TODO: make config
+        try:
+            for future in futures:
+                yield future.result()
+        finally:
+            # Drops pending checks once the caller has found a valid model
+            for future in futures:
+                future.cancel()
 
-            # Gets the out connections for each node
-            edges = [tuple(k.split("-")) for k in base_model.arch.edge_dict.keys()]
+    @overrides
+    def random_sample(self) -> ArchaiModel:
+        with self._validation_executor() as executor:
+            while True:
+                # Draws `nb_workers` candidates and checks them concurrently
+                models = [self._sample_model() for _ in range(self.nb_workers)]
 
-            def out_degree(x):
-                return len([(orig, dest) for orig, dest in edges if orig == x])
+                with closing(self._validate_models(models, executor)) as results:
+                    for model, (found_valid, macs) in zip(models, results):
+                        if found_valid:
+                            return ArchaiModel(model, model.to_hash(), {"parent": None, "macs": macs})
 
-            if node["name"] != "input":
-                k = min(chosen_node_idx, self.rng.randint(1, max_inputs))
-                input_idxs = self.rng.sample(range(chosen_node_idx), k)
+    @overrides
+    def mutate(self, base_model: ArchaiModel, patience: Optional[int] = 5) -> ArchaiModel:
+        parent_id = base_model.archid
+        nb_tries = 0
 
-                # Removes everything except inputs that have out degree == 1
-                node["inputs"] = [input for input in node["inputs"] if out_degree(input) <= 1]
+        # Gets the out degree of each node
+        out_degree = Counter(k.split("-", 1)[0] for k in base_model.arch.edge_dict.keys())
 
-                # Adds `k` new inputs
-                node["inputs"] += [graph[idx]["name"] for idx in input_idxs if graph[idx]["name"] not in node["inputs"]]
+        with self._validation_executor() as executor:
+            while nb_tries < patience:
+                nb_batch = min(self.nb_workers, patience - nb_tries)
+                nb_tries += nb_batch
 
-            # compile the model
-            nbr_model = SegmentationDagModel(
-                graph, channels_per_scale, post_upsample_layers, img_size=self.img_size, nb_classes=self.nb_classes
-            )
+                nbr_models = [self._mutate_model(base_model, out_degree) for _ in range(nb_batch)]
+                nbr_models = [nbr_model for nbr_model in nbr_models if nbr_model is not None]
 
-            if not self.is_valid_model(nbr_model)[0]:
-                logger.info(f"Neighbor generation {base_model.arch.to_hash()} -> {nbr_model.to_hash()} failed.")
-                continue
+                with closing(self._validate_models(nbr_models, executor)) as results:
+                    for nbr_model, (is_valid, macs) in zip(nbr_models, results):
+                        if not is_valid:
+                            logger.info(
+                                f"Neighbor generation {base_model.arch.to_hash()} -> {nbr_model.to_hash()} failed."
+                            )
+                            continue
 
-            return ArchaiModel(nbr_model, nbr_model.to_hash(), metadata={"parent": parent_id})
+                        return ArchaiModel(nbr_model, nbr_model.to_hash(), metadata={"parent": parent_id, "macs": macs})
 
     @overrides
     def crossover(self, model_list: List[ArchaiModel], patience: Optional[int] = 30) -> Optional[ArchaiModel]:
@@ -421,12 +528,20 @@ class SegmentationDagSearchSpace(EvolutionarySearchSpace):
         if len(left_n) <= 2 or len(right_n) <= 2:
             return
 
+        # Indexes the nodes of the right model by scale, excluding input and output nodes
+        right_scale2idxs = defaultdict(list)
+        for i, node in enumerate(right_arch[1:-1], start=1):
+            right_scale2idxs[node["scale"]].append(i)
+
+        # Gets node2idx for right model
+        right_node2idx = {node: i for i, node in enumerate(right_n)}
+
         # Tries to merge left_m and right_m
         result_g = None
         nb_tries = 0
 
         for nb_tries in range(patience):
-            left_g, right_g = copy.deepcopy(left_arch), copy.deepcopy(right_arch)
+            left_g, right_g = _clone_graph(left_arch), _clone_graph(right_arch)
             nb_tries += 1
 
             # Samples a pivot node from the left model
@@ -435,11 +550,7 @@ class SegmentationDagSearchSpace(EvolutionarySearchSpace):
 
             # Samples a pivot node from the right model w/ the same scale as the left_pivot
             # excluding input and output nodes
-            right_candidates = [
-                i
-                for i, fields in enumerate(right_g)
-                if fields["scale"] == left_g[left_pivot_idx]["scale"] and 0 < i < (len(right_n) - 1)
-            ]
+            right_candidates = right_scale2idxs.get(left_g[left_pivot_idx]["scale"], [])
 
             if len(right_candidates) > 0:
                 # Picks a right pivot
@@ -449,20 +560,20 @@ class SegmentationDagSearchSpace(EvolutionarySearchSpace):
                 left_half = left_g[: left_pivot_idx + 1]
                 right_half = right_g[right_pivot_idx:]
 
-                # Gets node2idx for right model
-                right_node2idx = {node: i for i, node in enumerate(right_n)}
+                # Indexes the node names of left_half by scale
+                left_scale2names = defaultdict(list)
+                for n in left_half:
+                    left_scale2names[n["scale"]].append(n["name"])
 
                 # Corrects connections from right_g
                 for fields in right_half[::-1]:
                     for inp_idx, inp in enumerate(fields["inputs"]):
 
                         # Checks if this connection falls outside of right_half
-                        if inp not in right_n[right_pivot_idx:]:
+                        if right_node2idx[inp] < right_pivot_idx:
                             # Finds a new starting node to connect this edge
                             # with the same original input scale
-                            candidates = [
-                                n["name"] for n in left_half if n["scale"] == right_g[right_node2idx[inp]]["scale"]
-                            ]
+                            candidates = left_scale2names.get(right_g[right_node2idx[inp]]["scale"], [])
 
                             fields["inputs"][inp_idx] = self.rng.choice(candidates) if len(candidates) > 0 else None
 
@@ -477,9 +588,7 @@ class SegmentationDagSearchSpace(EvolutionarySearchSpace):
                 result_g = self.rename_dag_node_list(left_half + right_half, add_input_output=True)
 
                 # Pick `channels_per_scale` and `post_upsample_layers` from left_m or right_m
-                ch_map = self.rng.choice(
-                    [copy.deepcopy(left_m.arch.channels_per_scale), copy.deepcopy(right_m.arch.channels_per_scale)]
-                )
+                ch_map = self.rng.choice([left_m.arch.channels_per_scale, right_m.arch.channels_per_scale])
 
                 post_upsample_layers = self.rng.choice(
                     [left_m.arch.post_upsample_layers, right_m.arch.post_upsample_layers]
@@ -496,9 +605,7 @@ class SegmentationDagSearchSpace(EvolutionarySearchSpace):
                         post_upsample_layers,
                     )
 
-                    out_shape = result_model.arch.validate_forward(
-                        torch.randn(1, 3, *result_model.arch.img_size[::-1])
-                    ).shape
+                    out_shape = result_model.arch.validate_forward(self._probe_input).shape
 
                     assert out_shape == torch.Size([1, self.nb_classes, *result_model.arch.img_size[::-1]])
 
@@ -84,9 +84,10 @@ class TransformerFlexSearchSpace(EvolutionarySearchSpace, BayesOptSearchSpace):
         "transfo-xl": {"d_model": "d_model", "d_inner": "d_inner", "n_head": "n_head", "n_layer": "n_layer"},
     }
 
-    _DEFAULT_D_MODEL = list(range(128, 1024, 64))
-    _DEFAULT_D_INNER = list(range(128, 1024, 64))
-    _DEFAULT_N_HEAD = [2, 4, 8]
+    # Immutable so they can be safely shared by every instance without being copied
+    _DEFAULT_D_MODEL = tuple(range(128, 1024, 64))
+    _DEFAULT_D_INNER = tuple(range(128, 1024, 64))
+    _DEFAULT_N_HEAD = (2, 4, 8)
 
     def __init__(
         self,
@@ -0,0 +1,69 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+# Profiles `SegmentationDagSearchSpace` sampling and mutation with cProfile.
+# For native frames (torch and tensorwatch), the script can also be run under py-spy:
+#   py-spy record --native -o segmentation_dag.svg -- python scripts/discrete_search/profile_segmentation_dag.py \
+#       --min_mac <min> --max_mac <max>
+
+import argparse
+import cProfile
+import pstats
+
+from archai.discrete_search.search_spaces.cv import SegmentationDagSearchSpace
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Profiles sampling and mutation of a segmentation DAG search space.")
+
+    parser.add_argument("-nc", "--nb_classes", type=int, default=19, help="Number of classes.")
+
+    parser.add_argument("-is", "--img_size", type=int, nargs=2, default=[256, 256], help="Image size (width, height).")
+
+    # The MAdds window is required, since it should be narrow enough to reject candidates
+    # so that rejection sampling and the MAdds checks in `mutate` are actually profiled
+    parser.add_argument("-mnm", "--min_mac", type=int, required=True, help="Minimum number of MAdds.")
+
+    parser.add_argument("-mxm", "--max_mac", type=int, required=True, help="Maximum number of MAdds.")
+
+    parser.add_argument("-nw", "--nb_workers", type=int, default=1, help="Number of validation threads.")
+
+    parser.add_argument("-s", "--seed", type=int, default=1, help="Random seed.")
+
+    parser.add_argument("-ns", "--nb_samples", type=int, default=200, help="Number of `random_sample` calls.")
+
+    parser.add_argument("-nm", "--nb_mutations", type=int, default=50, help="Number of `mutate` calls.")
+
+    parser.add_argument("-o", "--output_file", type=str, default="segmentation_dag.prof", help="Profile output file.")
+
+    parser.add_argument("-t", "--top", type=int, default=20, help="Number of functions to print.")
+
+    args = parser.parse_args()
+
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    search_space = SegmentationDagSearchSpace(
+        args.nb_classes,
+        tuple(args.img_size),
+        min_mac=args.min_mac,
+        max_mac=args.max_mac,
+        seed=args.seed,
+        nb_workers=args.nb_workers,
+    )
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+
+    models = [search_space.random_sample() for _ in range(args.nb_samples)]
+    for i in range(args.nb_mutations if models else 0):
+        search_space.mutate(models[i % len(models)])
+
+    profiler.disable()
+    profiler.dump_stats(args.output_file)
+
+    stats = pstats.Stats(profiler)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(args.top)
@@ -2,7 +2,12 @@
 # Licensed under the MIT license.
 
 import csv
+import os
+import queue
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+import torch
 
 """Train the models that are in the pareto front"""
 
@@ -10,88 +15,112 @@ import subprocess
 data_dir = "face_synthetics/dataset_100000"
 output_dir = "./output"
 csv_file = "search_results.csv"
+output_csv_file = "search_results_with_full_validation_error.csv"
 
 # Read the search results and pick the models in the pareto front
 pareto_archids = []
-search_results = []
 with open(csv_file, "r") as csvfile:
     reader = csv.DictReader(csvfile)
     for row in reader:
-        search_results.append(row)
         if row["is_pareto"] == "True":
             pareto_archids.append(row["archid"])
 print(f"Models to be trained: {pareto_archids}")
 
-# Train the models with subprocess call
-training_accuracy = {}
+# Train the models with subprocess call, one model per group of `nproc_per_node` GPUs
+nproc_per_node = 4
 num_epochs = 100
-for arch_id in pareto_archids:
-    print(f"Training model with arch_id: {arch_id}")
-    cmd = [
-        "torchrun",
-        "--nproc_per_node=4",
-        "train.py",
-        "--data-path",
-        data_dir,
-        "--output_dir",
-        output_dir,
-        "--search_result_archid",
-        arch_id,
-        "--search_result_csv",
-        csv_file,
-        "--train-crop-size",
-        "128",
-        "--epochs",
-        str(num_epochs),
-        "--batch-size",
-        "32",
-        "--lr",
-        "0.001",
-        "--opt",
-        "adamw",
-        "--lr-scheduler",
-        "steplr",
-        "--lr-step-size",
-        "100",
-        "--lr-gamma",
-        "0.5",
-        "-wd",
-        "0.00001",
-    ]
-
-    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, universal_newlines=True)
-
-    val_errors = []
-    while True:
-        output = process.stdout.readline()
-        if output == "" and process.poll() is not None:
-            break
-        if output:
-            print(output.strip())
+
+# Groups are built from the GPUs visible to this script, so an existing `CUDA_VISIBLE_DEVICES` is respected
+visible_gpus = os.environ.get("CUDA_VISIBLE_DEVICES")
+if visible_gpus:
+    visible_gpus = [gpu.strip() for gpu in visible_gpus.split(",")]
+else:
+    visible_gpus = [str(gpu) for gpu in range(torch.cuda.device_count())]
+
+num_gpu_groups = max(1, len(visible_gpus) // nproc_per_node)
+
+gpu_groups = queue.Queue()
+for group in range(num_gpu_groups):
+    gpu_groups.put(group)
+
+
+def train_model(arch_id):
+    group = gpu_groups.get()
+    try:
+        print(f"Training model with arch_id: {arch_id}")
+
+        # With a single group, the child simply inherits the environment of this script
+        env = None
+        if num_gpu_groups > 1:
+            gpu_ids = visible_gpus[group * nproc_per_node : (group + 1) * nproc_per_node]
+            env = dict(os.environ, CUDA_VISIBLE_DEVICES=",".join(gpu_ids))
+
+        cmd = [
+            "torchrun",
+            f"--nproc_per_node={nproc_per_node}",
+            f"--master_port={29500 + group}",
+            "train.py",
+            "--data-path",
+            data_dir,
+            "--output_dir",
+            os.path.join(output_dir, arch_id),
+            "--search_result_archid",
+            arch_id,
+            "--search_result_csv",
+            csv_file,
+            "--train-crop-size",
+            "128",
+            "--epochs",
+            str(num_epochs),
+            "--batch-size",
+            "32",
+            "--lr",
+            "0.001",
+            "--opt",
+            "adamw",
+            "--lr-scheduler",
+            "steplr",
+            "--lr-step-size",
+            "100",
+            "--lr-gamma",
+            "0.5",
+            "-wd",
+            "0.00001",
+        ]
+
+        # stderr is merged into stdout so a full stderr pipe can never block the child
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, env=env, text=True, bufsize=1)
+
+        val_errors = []
+        for output in process.stdout:
+            print(f"[{arch_id}] {output.strip()}")
             if output.startswith("Test:"):
                 if "Error" in output:
                     error_str = output.split()[-1]
                     val_error = float(error_str)
                     val_errors.append(val_error)
 
-    result = process.poll()
-    assert val_errors and len(val_errors) != 0  # should have at least one error
-    training_accuracy[arch_id] = val_errors[-1]
-
-# Merge training accuracy to search_results
-merged_data = []
-for row in search_results:
-    arch_id = row["archid"]
-    if arch_id in training_accuracy:
-        row["Full_Training_Validation_Error"] = training_accuracy[arch_id]
-    else:
-        row["Full_training_Validation_Error"] = ""
-    merged_data.append(row)
-
-# Write to csv
-fieldnames = search_results[0].keys()
-with open("search_results_with_full_validation_error.csv", "w", newline="") as csvfile:
-    writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-    writer.writeheader()
-    for row in merged_data:
-        writer.writerow(row)
+        process.wait()
+        assert val_errors and len(val_errors) != 0  # should have at least one error
+        return val_errors[-1]
+    finally:
+        gpu_groups.put(group)
+
+
+training_accuracy = {}
+with ThreadPoolExecutor(max_workers=num_gpu_groups) as executor:
+    futures = {arch_id: executor.submit(train_model, arch_id) for arch_id in pareto_archids}
+    for arch_id, future in futures.items():
+        training_accuracy[arch_id] = future.result()
+
+# Merge training accuracy to search_results, streaming rows from the input csv to the output csv
+with open(csv_file, "r") as in_csvfile, open(output_csv_file, "w", newline="") as out_csvfile:
+    reader = csv.reader(in_csvfile)
+    writer = csv.writer(out_csvfile)
+
+    fieldnames = next(reader)
+    archid_idx = fieldnames.index("archid")
+    writer.writerow(fieldnames + ["Full_Training_Validation_Error"])
+
+    for row in reader:
+        writer.writerow(row + [training_accuracy.get(row[archid_idx], "")])
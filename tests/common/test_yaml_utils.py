@@ -0,0 +1,77 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import pytest
+
+from archai.common import yaml_utils
+
+
+def test_rel2full_path():
+    # Assert that simple relative and absolute paths are concatenated
+    assert yaml_utils._rel2full_path((), "a") == ("a",)
+    assert yaml_utils._rel2full_path(("a", "b"), "c/d") == ("a", "b", "c", "d")
+    assert yaml_utils._rel2full_path(("a", "b"), "/c") == ("c",)
+
+    # Assert that dots, blanks and trailing slashes are normalized
+    assert yaml_utils._rel2full_path(("a", "b"), "../c") == ("a", "c")
+    assert yaml_utils._rel2full_path(("a", "b", "c"), "../../d/e") == ("a", "d", "e")
+    assert yaml_utils._rel2full_path(("a",), "./b/../c/") == ("a", "c")
+    assert yaml_utils._rel2full_path(("a",), " b / c ") == ("a", "b", "c")
+    assert yaml_utils._rel2full_path(("a",), "b//c") == ("a", "b", "c")
+    assert yaml_utils._rel2full_path(("a", "b"), "..") == ("a",)
+
+    # Assert that going above the root raises an error
+    with pytest.raises(RuntimeError):
+        yaml_utils._rel2full_path((), "..")
+
+
+def test_resolve_all():
+    # Assert that value and node copies are resolved
+    d = {
+        "a": {"x": 1, "y": "_copy: ../../b/z"},
+        "b": {"z": 3, "w": {"_copy": "/c"}},
+        "c": {"x": 2},
+    }
+    yaml_utils.resolve_all(d)
+    assert d["a"]["y"] == 3
+    assert d["b"]["w"] == {"x": 2}
+
+    # Assert that overridden keys are kept and nested nodes are merged
+    d = {
+        "a": {"_copy": "/b", "k": 5, "m": {"o": 2}},
+        "b": {"k": 1, "m": {"n": "_copy: /c", "o": 1}},
+        "c": [1, 2],
+    }
+    yaml_utils.resolve_all(d)
+    assert d["a"] == {"k": 5, "m": {"o": 2, "n": [1, 2]}}
+
+    # Assert that chains of copies are followed
+    d = {"a": "_copy: /b", "b": "_copy: /c", "c": 7}
+    yaml_utils.resolve_all(d)
+    assert d == {"a": 7, "b": 7, "c": 7}
+
+    # Assert that non-string keys can be walked
+    d = {1: {"a": "_copy: ../../b"}, "b": 2}
+    yaml_utils.resolve_all(d)
+    assert d[1]["a"] == 2
+
+    # Assert that missing paths raise an error
+    with pytest.raises(RuntimeError):
+        yaml_utils.resolve_all({"a": "_copy: /b"})
+
+    # Assert that circular references raise an error
+    with pytest.raises(RuntimeError):
+        yaml_utils.resolve_all({"a": "_copy: /b", "b": "_copy: /a"})
+
+
+def test_resolve_all_deep():
+    # Assert that deeply nested dictionaries do not hit the recursion limit
+    d = leaf = {}
+    for _ in range(2000):
+        leaf["n"] = {}
+        leaf = leaf["n"]
+    leaf["x"] = "_copy: /y"
+    d["y"] = 1
+
+    yaml_utils.resolve_all(d)
+    assert leaf["x"] == 1
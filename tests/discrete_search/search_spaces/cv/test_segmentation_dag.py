@@ -0,0 +1,62 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import copy
+
+import pytest
+
+from archai.discrete_search.api.archai_model import ArchaiModel
+from archai.discrete_search.search_spaces.cv import SegmentationDagSearchSpace
+from archai.discrete_search.search_spaces.cv.segmentation_dag.model import (
+    SegmentationDagModel,
+)
+
+
+@pytest.fixture
+def search_space():
+    return SegmentationDagSearchSpace(nb_classes=2, img_size=(64, 64), max_layers=4, seed=1, nb_workers=2)
+
+
+def test_segmentation_dag_threaded_sample_and_mutate(search_space):
+    models = [search_space.random_sample() for _ in range(3)]
+    assert all(isinstance(model, ArchaiModel) for model in models)
+    assert all(model.metadata["macs"] is not None for model in models)
+
+    for model in models:
+        nbr_model = search_space.mutate(model)
+
+        if nbr_model is not None:
+            assert nbr_model.metadata["parent"] == model.archid
+            assert nbr_model.metadata["macs"] is not None
+
+    # No thread pool is kept between calls, so the search space can still be copied
+    _ = copy.deepcopy(search_space)
+
+
+def test_segmentation_dag_scaled_macs_bounds(search_space):
+    for _ in range(3):
+        model = search_space.random_sample()
+        ch_per_scale = model.arch.channels_per_scale
+
+        for base_channels in search_space.base_channels_list:
+            for delta_channels in search_space.delta_channels_list:
+                channels_per_scale = {
+                    "base_channels": base_channels,
+                    "delta_channels": delta_channels,
+                    "mult_delta": ch_per_scale["mult_delta"],
+                }
+
+                # Channel-only neighbor, which shares the parent's graph and `post_upsample_layers`
+                nbr_model = SegmentationDagModel(
+                    copy.deepcopy(list(model.arch.graph.values())),
+                    channels_per_scale,
+                    model.arch.post_upsample_layers,
+                    img_size=search_space.img_size,
+                    nb_classes=search_space.nb_classes,
+                )
+
+                lower, upper = search_space._scaled_macs_bounds(model, channels_per_scale)
+                is_valid, macs = search_space.is_valid_model(nbr_model)
+
+                assert is_valid
+                assert lower * 0.8 <= macs <= upper * 1.2